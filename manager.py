@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 import requests
-import base64
+from requests.adapters import HTTPAdapter
+import hashlib
+import os
 import tempfile
+import threading
 from pathlib import Path
 from datetime import datetime
 import altair as alt
@@ -22,98 +26,372 @@ GIT_REPO = st.secrets["GIT_REPO"]
 GIT_BRANCH = st.secrets["GIT_BRANCH"]
 GIT_TOKEN = st.secrets["GIT_TOKEN"]
 
-def gh_headers():
-    return {
+GH_FRESH_SECONDS = 3  # 快取未滿此秒數時不再詢問 GitHub（需小於即時頁 5 秒更新）
+
+@st.cache_resource
+def gh_session():
+    # 共用 keep-alive 連線，省去每次請求的 TCP / TLS 握手
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    session.headers.update({
         "Authorization": f"Bearer {GIT_TOKEN}",
-        "Accept": "application/vnd.github+json"
-    }
+        "Accept": "application/vnd.github.raw"  # 直接取原始位元組，免 base64
+    })
+    return session
+
+@st.cache_resource
+def gh_etag_cache():
+    # path → (ETag, 雜湊, 內容, 取得時間)，跨 rerun / session 共用
+    return {}
+
+def db_digest(db_bytes):
+    # DB 內容的短雜湊，作為各快取的 key（避免 st.cache_data 每次雜湊整份 bytes）
+    if not db_bytes:
+        return None
+    return hashlib.blake2b(db_bytes, digest_size=16).hexdigest()
 
 def gh_download_file(path):
+    # 回傳 (內容雜湊, 內容)；雜湊只在實際下載時計算一次，供各快取當 key
     url = f"https://api.github.com/repos/{GIT_OWNER}/{GIT_REPO}/contents/{path}?ref={GIT_BRANCH}"
-    r = requests.get(url, headers=gh_headers(), timeout=20)
+    headers = {}
+
+    # ETag 快取：剛取得過就直接沿用；否則帶 If-None-Match，未變動時 GitHub 回 304
+    etag_cache = gh_etag_cache()
+    now = datetime.now()
+    if path in etag_cache:
+        etag, digest, content, fetched = etag_cache[path]
+        if (now - fetched).total_seconds() < GH_FRESH_SECONDS:
+            return digest, content
+        headers["If-None-Match"] = etag
+
+    r = gh_session().get(url, headers=headers, timeout=20)
+
+    if r.status_code == 304 and path in etag_cache:
+        etag_cache[path] = (etag, digest, content, now)
+        return digest, content
 
     if r.status_code != 200:
         st.error(f"❌ GitHub 下載失敗：HTTP {r.status_code} → {path}")
-        return None
+        return None, None
 
-    js = r.json()
-    if "content" not in js:
-        st.error(f"❌ GitHub 回傳格式錯誤（缺少 content）")
-        return None
+    content = r.content
+    digest = db_digest(content)
 
-    try:
-        return base64.b64decode(js["content"])
-    except Exception:
-        st.error("❌ Base64 解碼失敗")
-        return None
+    etag = r.headers.get("ETag")
+    if etag:
+        etag_cache[path] = (etag, digest, content, now)
+    return digest, content
 
 
 # ============================================================
 # SQLite 載入（自動欄位 mapping）
 # ============================================================
-def load_sqlite_bytes(db_bytes):
-    if not db_bytes:
-        return pd.DataFrame()
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M:%S")  # 收集端寫入的 time_str 格式
+
+def _tune(conn):
+    # 只讀查詢用：排序 / DISTINCT 暫存放記憶體、不寫 journal、不 fsync
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    return conn
+
+
+def _ro_connect(path):
+    # 下載的 DB 只讀不寫：唯讀 + immutable 開啟，省去鎖與 journal
+    conn = sqlite3.connect(f"{Path(path).as_uri()}?mode=ro&immutable=1", uri=True,
+                           check_same_thread=False)
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    return _tune(conn)
+
+
+@st.cache_resource
+def _tmp_store():
+    # 本 process 專用的暫存目錄與 lock：寫入 / 清理只動自己目錄內的檔案
+    return Path(tempfile.mkdtemp(prefix="ems_")), threading.Lock()
+
+
+def _open_sqlite_bytes(digest, db_bytes):
+    # Python 3.11+：直接在記憶體反序列化，不寫暫存檔
+    if hasattr(sqlite3.Connection, "deserialize"):
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.deserialize(db_bytes)
+        return _tune(conn)
+
+    tmp_dir, lock = _tmp_store()
+    tmp = tmp_dir / f"{digest}.sqlite"
+    with lock:
+        if not tmp.exists():
+            # 先寫到暫存名稱再 os.replace：寫入中斷時不會留下不完整的 DB 被沿用
+            part = tmp_dir / f"{digest}.part"
+            part.write_bytes(db_bytes)
+            os.replace(part, tmp)
+        conn = _ro_connect(tmp)
+
+        # 刪除目錄內其他版本的 DB 與中斷留下的 .part，避免暫存目錄隨 DB 更新無限增長
+        # （POSIX 上已開啟的連線仍可讀；Windows 上刪不掉則留待下次）
+        for old in tmp_dir.iterdir():
+            if old != tmp:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+    return conn
+
+
+def _parse_time(s):
+    # 依第一筆值判斷格式，整欄以固定格式走 C 快速路徑；都不符時才退回自動推斷
+    sample = s.dropna()
+    fmt = None
+    if not sample.empty:
+        for f in TIME_FORMATS:
+            try:
+                datetime.strptime(str(sample.iloc[0]), f)
+                fmt = f
+                break
+            except ValueError:
+                pass
+
+    return pd.to_datetime(s, format=fmt, errors="coerce", cache=True)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _sqlite_conn(digest, _db_bytes):
+    # 同一份 DB 內容共用一條連線（跨 rerun / session），以 lock 序列化查詢
+    return _open_sqlite_bytes(digest, _db_bytes), threading.Lock()
+
+
+# 欄位 mapping 規則：小寫欄位名含關鍵字即對應（依序比對，timestamp 需在 time 之前）
+COLUMN_RULES = (
+    ("work", "work_order"),
+    ("shift", "shift"),
+    ("device", "device"),
+    ("timestamp", "timestamp"),
+    ("time", "time_str"),
+    ("temp", "temperature"),
+    ("curr", "current"),
+)
+
+CANONICAL_COLUMNS = ("id", "work_order", "shift", "device",
+                     "timestamp", "time_str", "temperature", "current")
+
+def _column_map(columns):
+    # 欄位 mapping：原始欄位名 → 標準欄位名（已是標準名稱者直接沿用）
+    rename_map = {}
+    for c in columns:
+        if c in CANONICAL_COLUMNS:
+            rename_map[c] = c
+            continue
+        lc = c.lower()
+        canon = "id" if lc == "id" else next((v for k, v in COLUMN_RULES if k in lc), None)
+        if canon:
+            rename_map[c] = canon
+    return rename_map
+
+
+def _table_schema(conn):
+    # 取第一張表，回傳 (表名, 欄位 mapping)
+    cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    tables = [x[0] for x in cur.fetchall()]
+    if not tables:
+        return None, {}
+    table = tables[0]
+
+    cols = [x[1] for x in conn.execute(f'PRAGMA table_info("{table}")')]
+    return table, _column_map(cols)
+
+
+def _sql_col(rename_map, col):
+    # 標準欄位名 → SQL 欄位；DB 沒有此欄位時視為 NULL
+    for raw, canon in rename_map.items():
+        if canon == col:
+            return f'"{raw}"'
+    return "NULL"
+
+
+def _sql_select(rename_map):
+    # 只讀標準欄位，並在 SQL 中直接改名（AS），免 pandas rename / 補欄位
+    return ", ".join(f'{_sql_col(rename_map, col)} AS "{col}"' for col in CANONICAL_COLUMNS)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _sqlite_schema(digest, _db_bytes):
+    # 每份 DB 內容只解析一次 schema：(表名, 欄位 mapping, 投影欄位 SQL)
+    conn, lock = _sqlite_conn(digest, _db_bytes)
+    with lock:
+        table, rename_map = _table_schema(conn)
+    return table, rename_map, _sql_select(rename_map)
+
+
+def _sql_where(rename_map, date=None, work_order=None, device=None):
+    # 篩選條件下推到 SQL，只讀回需要的資料列
+    conds, params = [], []
+    if date is not None:
+        conds.append(f"substr({_sql_col(rename_map, 'time_str')}, 1, 10) = ?")
+        params.append(date)
+    if work_order is not None:
+        conds.append(f"{_sql_col(rename_map, 'work_order')} = ?")
+        params.append(work_order)
+    if device is not None:
+        conds.append(f"{_sql_col(rename_map, 'device')} = ?")
+        params.append(device)
+
+    where = " WHERE " + " AND ".join(conds) if conds else ""
+    return where, params
+
+
+def _ensure_filter_index(conn, table, rename_map):
+    # 記憶體副本上建 (日期, 工單, 機器) 複合索引，之後的篩選 / DISTINCT 查詢免全表掃描
+    keys = []
+    for col in ["time_str", "work_order", "device"]:
+        c = _sql_col(rename_map, col)
+        if c != "NULL":
+            keys.append(f"substr({c}, 1, 10)" if col == "time_str" else c)
+    if not keys:
+        return
+
+    try:
+        conn.execute(f'CREATE INDEX IF NOT EXISTS ems_filter_idx ON "{table}" ({", ".join(keys)})')
+    except sqlite3.OperationalError:
+        pass  # 唯讀暫存檔（舊版 Python）無法建索引，照常全表查詢
 
-    tmp = Path(tempfile.gettempdir()) / "ems_tmp.sqlite"
-    tmp.write_bytes(db_bytes)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def list_distinct(digest, _db_bytes, col, date=None, work_order=None):
+    # 下拉選單選項：SELECT DISTINCT，不必載入整張表
+    if not _db_bytes:
+        return []
 
     try:
-        conn = sqlite3.connect(tmp)
-        cur = conn.cursor()
+        table, rename_map, _ = _sqlite_schema(digest, _db_bytes)
+        if table is None:
+            return []
+
+        conn, lock = _sqlite_conn(digest, _db_bytes)
+        with lock:
+            _ensure_filter_index(conn, table, rename_map)
+
+            if col == "date":
+                expr = f"substr({_sql_col(rename_map, 'time_str')}, 1, 10)"
+            else:
+                expr = _sql_col(rename_map, col)
+
+            where, params = _sql_where(rename_map, date=date, work_order=work_order)
+            where += (" AND " if where else " WHERE ") + f"{expr} IS NOT NULL"
+
+            rows = conn.execute(
+                f'SELECT DISTINCT {expr} FROM "{table}"{where} ORDER BY 1', params
+            ).fetchall()
+
+    except Exception as e:
+        st.error(f"SQLite 讀取失敗：{e}")
+        return []
+
+    return [x[0] for x in rows]
+
 
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [x[0] for x in cur.fetchall()]
-        if not tables:
+# 回傳的 DataFrame 只讀不改：以 cache_resource 共用同一物件，命中時免 pickle 複製
+@st.cache_resource(ttl=300, max_entries=8, show_spinner=False)
+def load_sqlite_bytes(digest, _db_bytes, date=None, work_order=None, device=None):
+    if not _db_bytes:
+        return pd.DataFrame()
+
+    try:
+        table, rename_map, select = _sqlite_schema(digest, _db_bytes)
+        if table is None:
             return pd.DataFrame()
-        table = tables[0]
 
-        df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-        conn.close()
+        conn, lock = _sqlite_conn(digest, _db_bytes)
+        with lock:
+            if date is not None or work_order is not None or device is not None:
+                _ensure_filter_index(conn, table, rename_map)
+
+            where, params = _sql_where(rename_map, date=date, work_order=work_order,
+                                       device=device)
+            # 依時間排序交給 SQLite（time_str 為固定格式字串，字典序即時間序）
+            time_col = _sql_col(rename_map, "time_str")
+            order = f" ORDER BY {time_col}" if time_col != "NULL" else ""
+            df = pd.read_sql_query(f'SELECT {select} FROM "{table}"{where}{order}', conn,
+                                   params=params)
 
     except Exception as e:
         st.error(f"SQLite 讀取失敗：{e}")
         return pd.DataFrame()
 
-    # 欄位 mapping
-    rename_map = {}
-    for c in df.columns:
-        lc = c.lower()
-        if lc == "id":
-            rename_map[c] = "id"
-        elif "work" in lc:
-            rename_map[c] = "work_order"
-        elif "shift" in lc:
-            rename_map[c] = "shift"
-        elif "device" in lc:
-            rename_map[c] = "device"
-        elif "timestamp" in lc:
-            rename_map[c] = "timestamp"
-        elif "time" in lc:
-            rename_map[c] = "time_str"
-        elif "temp" in lc:
-            rename_map[c] = "temperature"
-        elif "curr" in lc:
-            rename_map[c] = "current"
-
-    df = df.rename(columns=rename_map)
-
-    # 補欄位
-    for col in ["id", "work_order", "shift", "device",
-                "timestamp", "time_str", "temperature", "current"]:
-        if col not in df.columns:
-            df[col] = None
-
-    df["ts_dt"] = pd.to_datetime(df["time_str"], errors="coerce")
-
-    return df.sort_values("ts_dt")
+    # 型別壓縮：低基數字串轉 category、數值轉 float32
+    for col in ["work_order", "shift", "device"]:
+        df[col] = df[col].astype("category")
+    for col in ["temperature", "current"]:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float32")  # SQLite 已回傳數值，免逐筆轉換
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce", downcast="float")
+
+    df["ts_dt"] = _parse_time(df["time_str"])
+
+    # SQL 依字串排序；time_str 未補零（如 9:40:55）或格式不一時字典序≠時間序，
+    # 此時以 ts_dt 重排（"last" 彙總與 LTTB 都依賴時間順序）
+    if not df["ts_dt"].dropna().is_monotonic_increasing:
+        df = df.sort_values("ts_dt", kind="stable")
+
+    return df
 
 
 # ============================================================
 # 繪圖：合併溫度 + 電流（同圖）
 # ============================================================
-def chart_device(dev_df):
-    chart = alt.Chart(dev_df).transform_fold(
+CHART_MAX_POINTS = 1000  # 每台設備送到瀏覽器的點數上限（溫度、電流各一半）
+
+def _lttb(x, y, n_out):
+    # Largest-Triangle-Three-Buckets：保留首尾，每桶挑出與前一選點、下一桶平均點
+    # 圍成最大三角形的點，抽樣後仍保有尖峰與趨勢形狀
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:nxt_hi].mean()
+        avg_y = y[hi:nxt_hi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+
+    return idx
+
+
+def _downsample(dev_df, n=CHART_MAX_POINTS):
+    # 溫度、電流各自做 LTTB，取兩者選到的資料列聯集
+    if len(dev_df) <= n:
+        return dev_df
+
+    ts = dev_df["ts_dt"]
+    x = ts.to_numpy("datetime64[ns]").astype(np.int64) / 1e9
+    has_ts = ts.notna().to_numpy()
+
+    keep = []
+    for col in ["temperature", "current"]:
+        y = dev_df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        ok = np.flatnonzero(has_ts & ~np.isnan(y))
+        keep.append(ok[_lttb(x[ok], y[ok], n // 2)])
+
+    return dev_df.iloc[np.unique(np.concatenate(keep))]
+
+
+def _chart_base(device=None):
+    chart = alt.Chart()
+    if device is not None:
+        chart = chart.transform_filter(alt.datum.device == device)
+
+    return chart.transform_fold(
         ["temperature", "current"],
         as_=["type", "value"]
     ).mark_line().encode(
@@ -127,36 +405,83 @@ def chart_device(dev_df):
         ]
     ).properties(height=200)
 
-    return chart
+
+@st.cache_resource
+def device_spec():
+    # 單台設備圖的 Vega-Lite spec 與資料無關：由 Altair 產生一次後跨 rerun 共用，之後每張圖只換資料
+    return {k: v for k, v in _chart_base().to_dict().items() if k not in ("data", "datasets")}
+
+
+def chart_device_data(dev_df):
+    return _downsample(dev_df[["ts_dt", "temperature", "current"]])
+
+
+def chart_devices(df):
+    # 多台設備合成一張 vconcat 圖：資料只送一次，各列在瀏覽器端依 device 篩選
+    groups = df[["device", "ts_dt", "temperature", "current"]].groupby("device", observed=True)
+    devices = [dev for dev, _ in groups]
+    if not devices:
+        return None
+
+    data = pd.concat([_downsample(dev_df) for _, dev_df in groups])
+    rows = [_chart_base(device=dev).properties(title=f"🖥️ {dev}") for dev in devices]
+    return alt.vconcat(*rows, data=data)
 
 
 # ============================================================
 # Real-time Page
 # ============================================================
+@st.cache_resource(ttl=300, max_entries=2, show_spinner=False)
+def realtime_snapshot(digest, _db_bytes):
+    # 每台設備的彙總與抽樣後圖表資料；DB 未更新的 tick 直接命中快取，不重算
+    df = load_sqlite_bytes(digest, _db_bytes)
+    if df.empty:
+        return None
+
+    # 載入時已依時間排序；groupby 一次，快照彙總與趨勢圖共用
+    grouped = df.dropna(subset=["ts_dt"]).groupby("device", observed=True)
+
+    # 每台設備的最新讀值與運行時長：一次 agg 算完
+    summary = grouped.agg(
+        ts_min=("ts_dt", "min"),
+        ts_max=("ts_dt", "max"),
+        temperature=("temperature", "last"),
+        current=("current", "last"),
+    )
+
+    # time_str 全部解析不出時間時，視同無資料
+    if summary.empty:
+        return None
+
+    secs = (summary["ts_max"] - summary["ts_min"]).dt.total_seconds().astype("int64")
+    summary["runtime"] = ((secs // 3600).astype(str).str.zfill(2) + ":"
+                          + (secs % 3600 // 60).astype(str).str.zfill(2) + ":"
+                          + (secs % 60).astype(str).str.zfill(2))
+
+    chart_data = {dev: chart_device_data(dev_df) for dev, dev_df in grouped}
+    return summary, chart_data
+
+
 def realtime_page():
     st.header("📡 即時資料（每 5 秒更新）")
+    realtime_fragment()
 
-    # 5 秒自動更新
-    if "rt_last_refresh" not in st.session_state:
-        st.session_state["rt_last_refresh"] = datetime.now()
 
+# 5 秒自動更新：只重跑此 fragment，側邊欄與標題不隨之重建
+@st.fragment(run_every=5)
+def realtime_fragment():
     now = datetime.now()
-    if (now - st.session_state["rt_last_refresh"]).total_seconds() >= 5:
-        st.session_state["rt_last_refresh"] = now
-        st.rerun()
 
     # --- Load DB ---
-    db_bytes = gh_download_file("Data/local/local_realtime.db")
-    df = load_sqlite_bytes(db_bytes)
+    digest, db_bytes = gh_download_file("Data/local/local_realtime.db")
+    snapshot = realtime_snapshot(digest, db_bytes)
 
-    if df.empty:
+    if snapshot is None:
         st.info("尚無即時資料")
         return
 
-    df["temperature"] = pd.to_numeric(df["temperature"], errors="coerce")
-    df["current"] = pd.to_numeric(df["current"], errors="coerce")
-
-    devices = sorted(df["device"].dropna().unique())
+    summary, chart_data = snapshot
+    devices = sorted(summary.index)
 
     N_PER_ROW = 2  # 每列 2 台設備
 
@@ -165,19 +490,13 @@ def realtime_page():
         cols = st.columns(len(row_devices))
 
         for idx, dev in enumerate(row_devices):
-            dev_df = df[df["device"] == dev].sort_values("ts_dt")
-            if dev_df.empty:
-                continue
-
-            last = dev_df.iloc[-1]  # 最新資料
+            last = summary.loc[dev]  # 最新資料
             temp = last["temperature"]
             curr = last["current"]
 
-            # 運行時長（秒）
-            runtime = (dev_df["ts_dt"].max() - dev_df["ts_dt"].min()).total_seconds()
-            runtime_str = f"{int(runtime//3600):02d}:{int((runtime%3600)//60):02d}:{int(runtime%60):02d}"
+            runtime_str = last["runtime"]
 
-            last_time = last["ts_dt"]
+            last_time = last["ts_max"]
             delay = (now - last_time).total_seconds()
 
             if delay < 10:
@@ -199,7 +518,7 @@ def realtime_page():
                 c3.metric("⏱ 運行時長", runtime_str)
 
                 # 趨勢圖
-                st.altair_chart(chart_device(dev_df), use_container_width=True)
+                st.vega_lite_chart(chart_data[dev], device_spec(), width="stretch")
 
 
 # ============================================================
@@ -208,43 +527,36 @@ def realtime_page():
 def history_page():
     st.header("📚 歷史資料")
 
-    db_bytes = gh_download_file("Data/local/local_historical.db")
-    df = load_sqlite_bytes(db_bytes)
+    digest, db_bytes = gh_download_file("Data/local/local_historical.db")
+    date_list = list_distinct(digest, db_bytes, "date")
 
-    if df.empty:
+    if not date_list:
         st.info("尚無歷史資料")
         return
 
-    df["temperature"] = pd.to_numeric(df["temperature"], errors="coerce")
-    df["current"] = pd.to_numeric(df["current"], errors="coerce")
-
-    df["date"] = df["time_str"].str[:10]
-    date_list = sorted(df["date"].dropna().unique())
-
     sel_date = st.selectbox("選擇日期", date_list)
-    df = df[df["date"] == sel_date]
 
-    orders = sorted(df["work_order"].dropna().unique())
+    orders = list_distinct(digest, db_bytes, "work_order", date=sel_date)
     sel_order = st.selectbox("工單", ["全部"] + orders)
-    if sel_order != "全部":
-        df = df[df["work_order"] == sel_order]
+    work_order = None if sel_order == "全部" else sel_order
 
-    devices = sorted(df["device"].dropna().unique())
+    devices = list_distinct(digest, db_bytes, "device", date=sel_date, work_order=work_order)
     sel_dev = st.selectbox("機器", ["全部"] + devices)
-    if sel_dev != "全部":
-        df = df[df["device"] == sel_dev]
+    device = None if sel_dev == "全部" else sel_dev
+
+    # 日期 / 工單 / 機器篩選下推到 SQL，只載入選到的資料
+    df = load_sqlite_bytes(digest, db_bytes, date=sel_date, work_order=work_order, device=device)
+    if df.empty:
+        st.info("尚無歷史資料")
+        return
 
     st.subheader("📄 資料表")
     st.dataframe(df, width="stretch")
 
     st.subheader("📈 趨勢圖")
-    for dev in sorted(df["device"].dropna().unique()):
-        dev_df = df[df["device"] == dev].sort_values("ts_dt")
-        if dev_df.empty:
-            continue
-
-        st.markdown(f"## 🖥️ {dev}")
-        st.altair_chart(chart_device(dev_df), use_container_width=True)
+    chart = chart_devices(df)
+    if chart is not None:
+        st.altair_chart(chart, width="stretch")
 
 
 # ============================================================